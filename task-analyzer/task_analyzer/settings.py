@@ -82,6 +82,18 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Reuse connections across requests instead of reconnecting each time
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # WAL lets readers run alongside a writer; NORMAL sync is safe with WAL
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+            # Wait up to 20s for a lock instead of failing with "database is locked"
+            'timeout': 20,
+            # Take the write lock when the transaction starts, so concurrent
+            # writers queue on the busy timeout instead of failing on upgrade
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
@@ -134,3 +146,38 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
     ],
 }
+
+# Delta analysis sessions (/api/tasks/sessions/) live in their own cache
+# (TASK_ANALYSIS_SESSION_CACHE). LocMemCache is private to each process: run
+# a single server process, or point this at a shared backend (Redis,
+# Memcached, database) when serving from several, otherwise a delta can
+# reach a process without the session.
+#
+# Each session uses up to three entries (session, version, lock), so
+# MAX_ENTRIES caps live sessions at about a third of it. Past the cap the
+# least recently used tenth is dropped before their timeout.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'analysis_sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'analysis-sessions',
+        'OPTIONS': {
+            'MAX_ENTRIES': 30000,
+            'CULL_FREQUENCY': 10,
+        },
+    },
+}
+
+TASK_ANALYSIS_SESSION_CACHE = 'analysis_sessions'
+
+# Seconds a delta analysis session is kept after its last update, as long
+# as the session cache isn't full (see CACHES above).
+TASK_ANALYSIS_SESSION_TIMEOUT = 3600
+
+# Seconds a delta waits for another delta on the same session before a 409
+TASK_ANALYSIS_SESSION_LOCK_WAIT = 5
+
+# Upper bound on worker processes a /api/tasks/analyze/batch/ request can ask for
+TASK_BATCH_MAX_WORKERS = 4
@@ -0,0 +1,160 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Tuple, Union
+
+from django.conf import settings
+
+from .parallel import rank_tasks
+from .scoring import TaskScorer
+
+
+def analyze_task_list(tasks_list: List[Dict[str, Any]], strategy: str = 'smart_balance',
+                      scorer: TaskScorer = None,
+                      explain: Union[str, int] = 'all',
+                      workers: int = 1) -> Dict[str, Any]:
+    """
+    Score and sort one task list, as /api/tasks/analyze/ does.
+
+    Returns the response body, or an {'error', 'cycles'} body when the
+    list has circular dependencies. A scorer can be passed in so batches
+    reuse one per strategy; its strategy is the one used and reported.
+
+    explain is "all", "none" or a number K: explanations are only built,
+    after sorting, for the top K tasks, and the rest are sent without one.
+
+    workers > 1 scores the list across that many processes (see
+    parallel.rank_tasks); only worth it for very large lists.
+    """
+    if scorer is None:
+        scorer = TaskScorer(strategy=strategy)
+    strategy = scorer.strategy
+
+    # Check for circular dependencies
+    cycles = scorer.detect_circular_dependencies(tasks_list)
+    if cycles:
+        return {
+            'error': 'Circular dependencies detected',
+            'cycles': cycles
+        }
+
+    # Calculate scores (blocked counts in one pass instead of per task)
+    blocked_counts = scorer.count_blocked_tasks(tasks_list)
+    if workers > 1:
+        order, scores = rank_tasks(tasks_list, strategy, workers, blocked_counts, scorer)
+        scored_tasks = [
+            {**tasks_list[i], 'priority_score': scores[i]} for i in order
+        ]
+    else:
+        scored_tasks = []
+        for task in tasks_list:
+            score = scorer.calculate_priority_score(task, blocked_counts=blocked_counts)
+
+            scored_tasks.append({
+                **task,
+                'priority_score': score
+            })
+
+        # Sort by score (highest first)
+        scored_tasks.sort(key=lambda x: x['priority_score'], reverse=True)
+
+    if explain == 'all':
+        explained = scored_tasks
+    elif explain == 'none':
+        explained = []
+    else:
+        explained = scored_tasks[:explain]
+    for scored_task in explained:
+        scored_task['explanation'] = scorer.generate_explanation(
+            scored_task, scored_task['priority_score']
+        )
+
+    return {
+        'tasks': scored_tasks,
+        'strategy_used': strategy,
+        'total_tasks': len(scored_tasks)
+    }
+
+
+def analyze_many(jobs: List[Tuple[str, List[Dict[str, Any]], str, Union[str, int]]]) -> List[Dict[str, Any]]:
+    """
+    Analyze (name, tasks_list, strategy, explain) jobs, one scorer per
+    strategy. Results are returned in job order.
+    """
+    scorers = {}
+    results = []
+    for name, tasks_list, strategy, explain in jobs:
+        if strategy not in scorers:
+            scorers[strategy] = TaskScorer(strategy=strategy)
+        results.append(analyze_task_list(tasks_list, strategy, scorers[strategy], explain))
+    return results
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """
+    The process pool batches are scored on, started on first use and kept
+    for the life of the server process (TASK_BATCH_MAX_WORKERS processes).
+    Workers are spawned rather than forked, so they don't inherit a copy
+    of a multi-threaded server process.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'TASK_BATCH_MAX_WORKERS', 4),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+
+def shutdown_pool():
+    """
+    Stop the batch pool and its manager thread, e.g. before forking; the
+    next batch starts a new one.
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Drop a broken pool (a worker died) so the next batch starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def analyze_batch(jobs: List[Tuple[str, List[Dict[str, Any]], str, Union[str, int]]],
+                  workers: int = 1) -> List[Dict[str, Any]]:
+    """
+    Analyze many independent task lists, optionally on the shared process
+    pool (see get_pool).
+
+    Jobs are split into one contiguous chunk per worker so each worker
+    process builds its scorers once. Results are returned in job order.
+    """
+    workers = max(1, min(workers, len(jobs)))
+    if workers == 1:
+        return analyze_many(jobs)
+
+    chunk_size = -(-len(jobs) // workers)
+    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+
+    pool = get_pool()
+    results = []
+    try:
+        for chunk_results in pool.map(analyze_many, chunks):
+            results.extend(chunk_results)
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+    return results
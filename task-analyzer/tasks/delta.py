@@ -0,0 +1,211 @@
+import secrets
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .scoring import TaskScorer
+
+CACHE_KEY_PREFIX = 'tasks:analysis-session:'
+LOCK_KEY_PREFIX = 'tasks:analysis-session-lock:'
+VERSION_KEY_PREFIX = 'tasks:analysis-session-version:'
+
+# A lock outlives a crashed request by at most this many seconds
+LOCK_TIMEOUT = 30
+
+
+class SessionError(Exception):
+    """Raised when a delta cannot be applied to a session."""
+
+
+class SessionConflict(SessionError):
+    """Raised when another request is updating (or has updated) the session."""
+
+
+class AnalysisSession:
+    """
+    Last submitted task graph and scores for one planning session.
+
+    Deltas (add / update / remove) keep the dependency counts up to date
+    incrementally, re-check cycles only around the tasks whose dependencies
+    changed, and rescore only the tasks whose inputs changed.
+    """
+
+    def __init__(self, strategy='smart_balance'):
+        self.token = secrets.token_urlsafe(16)
+        self.strategy = strategy
+        self.tasks = {}           # task id -> task dict
+        self.graph = {}           # task id -> dependency ids
+        self.blocked_counts = {}  # task id -> number of tasks depending on it
+        self.results = {}         # task id -> scored task dict
+        self.next_id = 1          # never reused, even after a remove
+        self.version = 0          # bumped on every save
+        self.scored_on = None
+        self.last_rescored = 0
+
+    def apply(self, add: Iterable[Dict[str, Any]] = (),
+              update: Iterable[Dict[str, Any]] = (),
+              remove: Iterable[int] = (),
+              strategy: str = None) -> List[List[int]]:
+        """
+        Apply a delta and rescore the affected tasks.
+
+        Returns the cycles found (nothing is rescored in that case, and the
+        caller should discard this session object rather than save it).
+        """
+        dirty = set()
+        roots = set()
+
+        for task_id in remove:
+            if task_id not in self.tasks:
+                raise SessionError(f'Unknown task id {task_id}')
+            del self.tasks[task_id]
+            dirty.update(self._set_dependencies(task_id, None))
+            self.results.pop(task_id, None)
+
+        for changes in update:
+            task_id = changes['id']
+            task = self.tasks.get(task_id)
+            if task is None:
+                raise SessionError(f'Unknown task id {task_id}')
+            task.update(changes)
+            if 'dependencies' in changes:
+                dirty.update(self._set_dependencies(task_id, task['dependencies']))
+                roots.add(task_id)
+            dirty.add(task_id)
+
+        # Reserve the ids the new tasks bring along first, so tasks without
+        # one can't be given an id that appears later in the same list
+        add = list(add)
+        for task in add:
+            if task.get('id') is not None:
+                self.next_id = max(self.next_id, task['id'] + 1)
+
+        for task in add:
+            task_id = task.get('id')
+            if task_id is None:
+                task_id = self.next_id
+            if task_id in self.tasks:
+                raise SessionError(f'Duplicate task id {task_id}')
+            self.next_id = max(self.next_id, task_id + 1)
+            task = {**task, 'id': task_id}
+            self.tasks[task_id] = task
+            dirty.update(self._set_dependencies(task_id, task.get('dependencies', [])))
+            roots.add(task_id)
+            dirty.add(task_id)
+
+        if strategy and strategy != self.strategy:
+            self.strategy = strategy
+            self.scored_on = None
+
+        scorer = TaskScorer(strategy=self.strategy)
+
+        cycles = scorer.find_cycles(self.graph, roots)
+        if cycles:
+            return cycles
+
+        # Urgency is relative to today, so a new day (or a strategy
+        # switch) invalidates every score
+        today = scorer.as_of
+        if self.scored_on != today:
+            dirty = set(self.tasks)
+            self.scored_on = today
+
+        for task_id in dirty:
+            task = self.tasks.get(task_id)
+            if task is None:
+                continue
+            score = scorer.calculate_priority_score(task, blocked_counts=self.blocked_counts)
+            self.results[task_id] = {
+                **task,
+                'priority_score': score,
+                'explanation': scorer.generate_explanation(task, score)
+            }
+
+        self.last_rescored = len(dirty & self.tasks.keys())
+        return []
+
+    def ranking(self) -> List[Dict[str, Any]]:
+        """Scored tasks sorted by score (highest first)."""
+        return sorted(self.results.values(),
+                      key=lambda x: x['priority_score'], reverse=True)
+
+    def _set_dependencies(self, task_id: int,
+                          dependencies: Optional[List[int]]) -> set:
+        """
+        Replace a task's dependency edges (None removes the task).
+        Returns the ids whose blocked count changed.
+        """
+        old = set(self.graph.pop(task_id, []))
+        new = set(dependencies or [])
+        if dependencies is not None:
+            self.graph[task_id] = list(dependencies)
+
+        for dep_id in old - new:
+            self.blocked_counts[dep_id] -= 1
+            if not self.blocked_counts[dep_id]:
+                del self.blocked_counts[dep_id]
+        for dep_id in new - old:
+            self.blocked_counts[dep_id] = self.blocked_counts.get(dep_id, 0) + 1
+
+        return old ^ new
+
+
+def _session_cache():
+    """
+    The cache sessions live in (TASK_ANALYSIS_SESSION_CACHE). A per-process
+    LocMemCache by default, so serving sessions from several processes
+    needs it pointed at a shared backend (Redis, Memcached, database).
+    """
+    return caches[getattr(settings, 'TASK_ANALYSIS_SESSION_CACHE', 'default')]
+
+
+@contextmanager
+def session_lock(token: str, wait: float = None):
+    """
+    Hold the session's lock around load / apply / save so concurrent deltas
+    for one token are applied one after the other instead of overwriting
+    each other. cache.add() only succeeds for one caller at a time.
+    Raises SessionConflict if the lock isn't free within wait seconds
+    (TASK_ANALYSIS_SESSION_LOCK_WAIT by default).
+    """
+    if wait is None:
+        wait = getattr(settings, 'TASK_ANALYSIS_SESSION_LOCK_WAIT', 5)
+    cache = _session_cache()
+    key = LOCK_KEY_PREFIX + token
+    deadline = time.monotonic() + wait
+    while not cache.add(key, True, LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            raise SessionConflict('Session is being updated by another request')
+        time.sleep(0.01)
+    try:
+        yield
+    finally:
+        cache.delete(key)
+
+
+def load_session(token: str) -> Optional[AnalysisSession]:
+    return _session_cache().get(CACHE_KEY_PREFIX + token)
+
+
+def save_session(session: AnalysisSession):
+    """
+    Store a session. Raises SessionConflict if the stored copy changed
+    since this one was loaded (e.g. a lock expired mid-request).
+
+    The version is kept under its own key, so the check reads an integer
+    rather than unpickling the whole stored session.
+    """
+    cache = _session_cache()
+    version_key = VERSION_KEY_PREFIX + session.token
+    stored_version = cache.get(version_key)
+    if stored_version is not None and stored_version != session.version:
+        raise SessionConflict('Session was updated by another request')
+    session.version += 1
+    timeout = getattr(settings, 'TASK_ANALYSIS_SESSION_TIMEOUT', 3600)
+    cache.set_many({
+        CACHE_KEY_PREFIX + session.token: session,
+        version_key: session.version
+    }, timeout)
@@ -0,0 +1,113 @@
+import math
+import threading
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, OperationalError
+
+from tasks.models import Task
+from tasks.storage import save_tasks, refresh_scores
+
+
+def _percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Multi-threaded write load test for Task storage. Each thread saves '
+        'batches of tasks and periodically refreshes their scores, then write '
+        'throughput and p50/p99 latencies are reported. Runs against the '
+        'configured database; created tasks are deleted afterwards unless --keep.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--writes', type=int, default=100,
+                            help='Task batches saved per thread')
+        parser.add_argument('--batch-size', type=int, default=10,
+                            help='Tasks per saved batch')
+        parser.add_argument('--refresh-every', type=int, default=10,
+                            help='Refresh scores after every N batches (0 disables)')
+        parser.add_argument('--keep', action='store_true',
+                            help='Keep the created tasks')
+
+    def handle(self, *args, **options):
+        lock = threading.Lock()
+        write_latencies = []
+        refresh_latencies = []
+        created_ids = []
+        errors = []
+
+        def worker(thread_no):
+            today = date.today()
+            own_ids = []
+            try:
+                for i in range(options['writes']):
+                    tasks_data = [
+                        {
+                            'title': f'Load test {thread_no}-{i}-{j}',
+                            'due_date': today + timedelta(days=j % 30),
+                            'estimated_hours': 1 + j % 8,
+                            'importance': 1 + j % 10,
+                            'dependencies': own_ids[-2:]
+                        }
+                        for j in range(options['batch_size'])
+                    ]
+                    started = time.perf_counter()
+                    try:
+                        tasks = save_tasks(tasks_data)
+                    except OperationalError as e:
+                        errors.append(str(e))
+                        continue
+                    write_latency = time.perf_counter() - started
+                    own_ids.extend(task.pk for task in tasks)
+
+                    refresh_latency = None
+                    if options['refresh_every'] and (i + 1) % options['refresh_every'] == 0:
+                        started = time.perf_counter()
+                        try:
+                            refresh_scores(task_ids=own_ids[-options['refresh_every'] * options['batch_size']:])
+                            refresh_latency = time.perf_counter() - started
+                        except OperationalError as e:
+                            errors.append(str(e))
+
+                    with lock:
+                        write_latencies.append(write_latency)
+                        if refresh_latency is not None:
+                            refresh_latencies.append(refresh_latency)
+            finally:
+                with lock:
+                    created_ids.extend(own_ids)
+                # Each thread has its own connection; don't leak it
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        tasks_written = len(created_ids)
+        self.stdout.write(f"Threads:            {options['threads']}")
+        self.stdout.write(f'Elapsed:            {elapsed:.2f}s')
+        self.stdout.write(f'Tasks written:      {tasks_written} '
+                          f'({tasks_written / elapsed:.0f} tasks/s, '
+                          f'{len(write_latencies) / elapsed:.0f} batches/s)')
+        self.stdout.write(f'Write latency:      p50 {_percentile(write_latencies, 50) * 1000:.1f}ms, '
+                          f'p99 {_percentile(write_latencies, 99) * 1000:.1f}ms')
+        if refresh_latencies:
+            self.stdout.write(f'Refresh latency:    p50 {_percentile(refresh_latencies, 50) * 1000:.1f}ms, '
+                              f'p99 {_percentile(refresh_latencies, 99) * 1000:.1f}ms')
+        self.stdout.write(f'Lock errors:        {len(errors)}')
+
+        if not options['keep']:
+            Task.objects.filter(pk__in=created_ids).delete()
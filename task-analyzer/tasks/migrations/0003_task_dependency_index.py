@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_dependency_edges(apps, schema_editor):
+    """Index the dependencies of tasks stored before the edge table existed."""
+    Task = apps.get_model('tasks', 'Task')
+    TaskDependency = apps.get_model('tasks', 'TaskDependency')
+    edges = [
+        TaskDependency(task_id=task_id, depends_on=dep_id)
+        for task_id, dependencies in Task.objects.values_list('id', 'dependencies').iterator()
+        for dep_id in dict.fromkeys(dependencies or [])
+        if isinstance(dep_id, int) and not isinstance(dep_id, bool)
+    ]
+    TaskDependency.objects.bulk_create(edges, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_task_scores'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDependency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depends_on', models.BigIntegerField(db_index=True)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dependency_edges', to='tasks.task')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('task', 'depends_on'), name='unique_task_dependency')],
+            },
+        ),
+        migrations.RunPython(build_dependency_edges, migrations.RunPython.noop),
+    ]
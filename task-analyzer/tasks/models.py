@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
@@ -15,10 +15,61 @@ class Task(models.Model):
     dependencies = models.JSONField(default=list, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # Last stored score, written in bulk by storage.refresh_scores
+    priority_score = models.FloatField(null=True, blank=True, db_index=True)
+    explanation = models.CharField(max_length=255, blank=True, default='')
+    scored_at = models.DateTimeField(null=True, blank=True)
+    
     class Meta:
         ordering = ['-created_at']
     
     def __str__(self):
         return self.title
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if update_fields is None or 'dependencies' in update_fields:
+                TaskDependency.sync(self)
+
+
+class TaskDependency(models.Model):
+    """
+    One edge of the dependency graph: task depends on depends_on.
+    
+    Indexed copy of Task.dependencies so reverse lookups ("what does this
+    block") are index lookups instead of scanning every task's JSON.
+    depends_on is a plain id, not a foreign key, because dependencies may
+    name tasks that don't exist (yet), just like the JSON list.
+    
+    Task.save() keeps the edges in sync; bulk writes go through
+    tasks.storage, which writes the edges itself.
+    """
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='dependency_edges')
+    depends_on = models.BigIntegerField(db_index=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'depends_on'], name='unique_task_dependency')
+        ]
+    
+    def __str__(self):
+        return f'{self.task_id} -> {self.depends_on}'
+    
+    @classmethod
+    def edges_for(cls, task):
+        """Unsaved edges for a task's dependency list (duplicates dropped)."""
+        return [
+            cls(task_id=task.pk, depends_on=dep_id)
+            for dep_id in dict.fromkeys(task.dependencies or [])
+            if isinstance(dep_id, int) and not isinstance(dep_id, bool)
+        ]
+    
+    @classmethod
+    def sync(cls, task):
+        """Replace a saved task's edges with its current dependency list."""
+        cls.objects.filter(task_id=task.pk).delete()
+        cls.objects.bulk_create(cls.edges_for(task))
 
 
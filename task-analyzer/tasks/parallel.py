@@ -0,0 +1,242 @@
+import math
+import multiprocessing
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Dict, Any, Tuple
+
+from .scoring import TaskScorer
+
+# Sentinels for values the scorer treats as missing or invalid
+NO_DUE_DATE = -2 ** 31  # days column: urgency falls back to 50
+NO_TASK_ID = -1         # blocked column: dependency score falls back to 50
+
+# Column layout of the shared buffer, one slot per task. float64 columns
+# come first so every column starts 8-byte aligned.
+FLOAT_COLUMNS = ['importance', 'hours', 'score']
+INT_COLUMNS = ['days', 'blocked', 'order']
+BYTES_PER_TASK = 8 * len(FLOAT_COLUMNS) + 4 * len(INT_COLUMNS)
+
+COMPONENTS = ['urgency', 'importance', 'effort', 'dependency']
+
+# (tasks, scorer, blocked_counts) of the rank_tasks call in progress. Forked
+# workers inherit it, so each can pack its own slice without the task list
+# being pickled and sent to it.
+_job = None
+
+
+def _open_columns(buf, count: int) -> Dict[str, memoryview]:
+    """Typed zero-copy views of each column in a shared buffer."""
+    columns = {}
+    offset = 0
+    for names, itemsize, typecode in ((FLOAT_COLUMNS, 8, 'd'), (INT_COLUMNS, 4, 'i')):
+        for name in names:
+            columns[name] = buf[offset:offset + count * itemsize].cast(typecode)
+            offset += count * itemsize
+    return columns
+
+
+def _close_columns(columns: Dict[str, memoryview]):
+    # Views must be released before the shared memory can be closed
+    for view in columns.values():
+        view.release()
+
+
+def _lookup_column(values: List[Any], convert) -> Any:
+    """
+    Map values through convert, calling it once per distinct value.
+    Falls back to a plain loop when values aren't hashable.
+    """
+    try:
+        lookup = {value: convert(value) for value in set(values)}
+    except TypeError:
+        return [convert(value) for value in values]
+    return map(lookup.__getitem__, values)
+
+
+def _pack(columns: Dict[str, memoryview], tasks: List[Dict[str, Any]],
+          scorer: TaskScorer, blocked_counts: Dict[int, int],
+          start: int = 0, stop: int = None):
+    """
+    Write the scoring inputs of tasks start..stop into the shared columns.
+    Invalid values are packed so the workers score them like TaskScorer does.
+    """
+    stop = len(tasks) if stop is None else stop
+    tasks = tasks[start:stop]
+
+    def days_until(due_date):
+        days = scorer._days_until_due({'due_date': due_date})
+        return NO_DUE_DATE if days is None else days
+
+    def importance(value):
+        return value if isinstance(value, (int, float)) else math.nan
+
+    def hours(value):
+        return value if isinstance(value, (int, float)) else 0.0
+
+    columns['days'][start:stop] = array('i', _lookup_column(
+        [task.get('due_date') for task in tasks], days_until))
+    columns['importance'][start:stop] = array('d', _lookup_column(
+        [task.get('importance', 5) for task in tasks], importance))
+    columns['hours'][start:stop] = array('d', _lookup_column(
+        [task.get('estimated_hours', 5) for task in tasks], hours))
+    # Ids are all distinct, so a lookup table wouldn't save anything
+    columns['blocked'][start:stop] = array('i', [
+        blocked_counts.get(task_id, 0) if task_id else NO_TASK_ID
+        for task_id in [task.get('id') for task in tasks]
+    ])
+
+
+def _score_range(columns: Dict[str, memoryview], start: int, stop: int, strategy: str):
+    """
+    Score tasks start..stop from the packed columns, then write their
+    indices, sorted by score (highest first, ties in input order), into the
+    same slice of the order column.
+    """
+    scorer = TaskScorer(strategy=strategy)
+    strategy = strategy if strategy in scorer.STRATEGY_WEIGHTS else 'smart_balance'
+    # Same terms in the same order as the strategy, so scores match exactly
+    weights = [(COMPONENTS.index(name), weight) for name, weight in scorer.STRATEGY_WEIGHTS[strategy]]
+    rounded = strategy == 'smart_balance'
+
+    days, importance, hours, blocked, scores = (
+        columns['days'], columns['importance'], columns['hours'],
+        columns['blocked'], columns['score']
+    )
+    # Inputs repeat a lot (due dates, 1-10 ratings), so cache per value
+    urgency_cache, importance_cache, effort_cache, dependency_cache = {}, {}, {}, {}
+
+    for i in range(start, stop):
+        day = days[i]
+        urgency = urgency_cache.get(day)
+        if urgency is None:
+            urgency = 50.0 if day == NO_DUE_DATE else scorer._urgency_for_days(day)
+            urgency_cache[day] = urgency
+
+        rating = importance[i]
+        importance_score = importance_cache.get(rating)
+        if importance_score is None:
+            importance_score = 50.0 if math.isnan(rating) else scorer._importance_for(rating)
+            importance_cache[rating] = importance_score
+
+        hour = hours[i]
+        effort = effort_cache.get(hour)
+        if effort is None:
+            effort = effort_cache[hour] = scorer._effort_for(hour)
+
+        count = blocked[i]
+        dependency = dependency_cache.get(count)
+        if dependency is None:
+            dependency = 50.0 if count == NO_TASK_ID else scorer._score_blocked_count(count)
+            dependency_cache[count] = dependency
+
+        components = (urgency, importance_score, effort, dependency)
+        total = 0.0
+        for index, weight in weights:
+            total += components[index] * weight
+        scores[i] = round(total, 2) if rounded else total
+
+    run = sorted(range(start, stop), key=scores.__getitem__, reverse=True)
+    columns['order'][start:stop] = array('i', run)
+
+
+def _score_shard(shm_name: str, count: int, start: int, stop: int, strategy: str,
+                 pack: bool):
+    """
+    Worker entry point: attach to the shared buffer, pack the slice from
+    the inherited job if asked to, and score it.
+    """
+    shm = SharedMemory(name=shm_name)
+    columns = _open_columns(shm.buf, count)
+    try:
+        if pack:
+            tasks, scorer, blocked_counts = _job
+            _pack(columns, tasks, scorer, blocked_counts, start, stop)
+        _score_range(columns, start, stop, strategy)
+    finally:
+        _close_columns(columns)
+        shm.close()
+
+
+def _fork_context():
+    """The fork start method, or None where the platform doesn't have it."""
+    try:
+        return multiprocessing.get_context('fork')
+    except ValueError:
+        return None
+
+
+def rank_tasks(tasks: List[Dict[str, Any]], strategy: str = 'smart_balance',
+               workers: int = 1, blocked_counts: Dict[int, int] = None,
+               scorer: TaskScorer = None) -> Tuple[List[int], List[float]]:
+    """
+    Score a large task list on several cores.
+
+    The scoring inputs (days until due, importance, hours and blocked
+    counts) go into one shared memory buffer. Worker processes are forked,
+    so they see the task list without it being copied to them. Each one
+    packs and scores a disjoint slice of the buffer in place and leaves a
+    sorted run of its slice there. The runs are then combined by one sort,
+    which merges presorted runs in linear-ish time. Where fork isn't
+    available the packing happens up front in this process instead.
+
+    Blocked counts are computed here unless passed in. A passed scorer
+    decides both the strategy (overriding the strategy argument) and the
+    date urgency is measured from, as on the single-process path. Call this
+    from a process with no other threads running, e.g. a management command
+    or a job worker, not from inside a threaded web server.
+
+    Returns (order, scores): task indices from highest to lowest score (ties
+    keep input order, like /analyze/) and the score of each task by index.
+    Scores match TaskScorer.calculate_priority_score exactly.
+    """
+    global _job
+
+    count = len(tasks)
+    if count == 0:
+        return [], []
+
+    if scorer is None:
+        scorer = TaskScorer(strategy=strategy)
+    strategy = scorer.strategy
+    if blocked_counts is None:
+        blocked_counts = scorer.count_blocked_tasks(tasks)
+
+    workers = max(1, min(workers, count))
+    shard_size = -(-count // workers)
+    shards = [(start, min(start + shard_size, count)) for start in range(0, count, shard_size)]
+
+    shm = SharedMemory(create=True, size=count * BYTES_PER_TASK)
+    columns = _open_columns(shm.buf, count)
+    try:
+        if workers == 1:
+            _pack(columns, tasks, scorer, blocked_counts)
+            _score_range(columns, 0, count, strategy)
+        else:
+            context = _fork_context()
+            pack_in_workers = context is not None
+            if pack_in_workers:
+                _job = (tasks, scorer, blocked_counts)
+            else:
+                _pack(columns, tasks, scorer, blocked_counts)
+            try:
+                # All workers are forked on the first submit, while _job is set
+                with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                    list(executor.map(
+                        _score_shard,
+                        *zip(*[(shm.name, count, start, stop, strategy, pack_in_workers)
+                               for start, stop in shards])
+                    ))
+            finally:
+                _job = None
+
+        scores = columns['score'].tolist()
+        # The order column holds one descending run per shard, in input
+        # order. Timsort finds the runs and merges them, and being stable
+        # it keeps equal scores in input order.
+        order = sorted(columns['order'].tolist(), key=scores.__getitem__, reverse=True)
+        return order, scores
+    finally:
+        _close_columns(columns)
+        shm.close()
+        shm.unlink()
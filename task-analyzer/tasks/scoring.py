@@ -1,5 +1,36 @@
 from datetime import datetime, date
-from typing import List, Dict, Any, Set
+from functools import lru_cache
+from typing import List, Dict, Any, Set, Iterable, Optional
+
+
+@lru_cache(maxsize=4096)
+def _explanation_text(days_until: Optional[int], high_importance: bool,
+                      effort_reason: Optional[str]) -> str:
+    """
+    Build an explanation from its reasons. Cached, so tasks with the same
+    reasons share one string instead of each building their own.
+    """
+    reasons = []
+    
+    if days_until is not None:
+        if days_until < 0:
+            reasons.append(f"Overdue by {abs(days_until)} days")
+        elif days_until == 0:
+            reasons.append("Due today")
+        elif days_until <= 3:
+            reasons.append(f"Due in {days_until} days")
+    
+    if high_importance:
+        reasons.append("High importance")
+    
+    if effort_reason:
+        reasons.append(effort_reason)
+    
+    if not reasons:
+        reasons.append("Balanced priority")
+    
+    return " • ".join(reasons)
+
 
 class TaskScorer:
     """
@@ -12,14 +43,33 @@ class TaskScorer:
     - Dependencies (blocking other tasks)
     """
     
-    def __init__(self, strategy='smart_balance'):
+    # Weighted components of each strategy, in the order they are summed
+    STRATEGY_WEIGHTS = {
+        'smart_balance': (('urgency', 0.35), ('importance', 0.30),
+                          ('effort', 0.20), ('dependency', 0.15)),
+        'fastest_wins': (('effort', 0.70), ('importance', 0.30)),
+        'high_impact': (('importance', 0.75), ('urgency', 0.25)),
+        'deadline_driven': (('urgency', 0.80), ('importance', 0.20)),
+    }
+    
+    def __init__(self, strategy='smart_balance', as_of: date = None):
         self.strategy = strategy
+        # Date urgency is measured from. Defaults to the day the scorer is
+        # created, so one scoring pass uses the same "today" for every task.
+        self.as_of = as_of or date.today()
+        # Days until due per distinct due date, shared by urgency and
+        # explanations so each date is parsed and diffed once
+        self._days_until_cache = {}
         
     def calculate_priority_score(self, task: Dict[str, Any], 
-                                 all_tasks: List[Dict[str, Any]] = None) -> float:
+                                 all_tasks: List[Dict[str, Any]] = None,
+                                 blocked_counts: Dict[int, int] = None) -> float:
         """
         Calculate a priority score for a single task.
         Returns a score between 0-100 (higher = more urgent/important)
+        
+        blocked_counts (from count_blocked_tasks) can be passed instead of
+        all_tasks to avoid rescanning the whole list for every task.
         """
         if self.strategy == 'fastest_wins':
             return self._fastest_wins_score(task)
@@ -28,10 +78,11 @@ class TaskScorer:
         elif self.strategy == 'deadline_driven':
             return self._deadline_driven_score(task)
         else:  # smart_balance
-            return self._smart_balance_score(task, all_tasks or [])
+            return self._smart_balance_score(task, all_tasks or [], blocked_counts)
     
     def _smart_balance_score(self, task: Dict[str, Any], 
-                            all_tasks: List[Dict[str, Any]]) -> float:
+                            all_tasks: List[Dict[str, Any]],
+                            blocked_counts: Dict[int, int] = None) -> float:
         """
         Main algorithm that balances all factors intelligently.
         
@@ -44,7 +95,7 @@ class TaskScorer:
         urgency_score = self._calculate_urgency(task)
         importance_score = self._calculate_importance(task)
         effort_score = self._calculate_effort_score(task)
-        dependency_score = self._calculate_dependency_score(task, all_tasks)
+        dependency_score = self._calculate_dependency_score(task, all_tasks, blocked_counts)
         
         # Weighted combination
         total_score = (
@@ -61,45 +112,66 @@ class TaskScorer:
         Calculate urgency based on due date.
         Overdue tasks get maximum urgency.
         """
+        days_until_due = self._days_until_due(task)
+        if days_until_due is None:
+            return 50.0  # Neutral score for missing/invalid date
+        
+        return self._urgency_for_days(days_until_due)
+    
+    def _days_until_due(self, task: Dict[str, Any]) -> Optional[int]:
+        """Days from today (or as_of) until the task is due, None if no valid date."""
+        due_date_str = task.get('due_date')
+        try:
+            return self._days_until_cache[due_date_str]
+        except (KeyError, TypeError):
+            due_date = self._parse_due_date(task)
+            days_until_due = None if due_date is None else (due_date - self.as_of).days
+            if isinstance(due_date_str, (str, date)):
+                self._days_until_cache[due_date_str] = days_until_due
+            return days_until_due
+    
+    def _parse_due_date(self, task: Dict[str, Any]):
+        """Return the task's due date, or None if missing or invalid."""
         due_date_str = task.get('due_date')
         if not due_date_str:
-            return 50.0  # Neutral score for missing date
+            return None
         
-        try:
-            if isinstance(due_date_str, str):
-                due_date = datetime.strptime(due_date_str, '%Y-%m-%d').date()
-            else:
-                due_date = due_date_str
-            
-            today = date.today()
-            days_until_due = (due_date - today).days
-            
-            # Overdue tasks
-            if days_until_due < 0:
-                # More overdue = higher urgency (caps at 100)
-                return min(100.0, 100 + abs(days_until_due) * 5)
-            
-            # Due today
-            if days_until_due == 0:
-                return 95.0
-            
-            # Due within a week - high urgency
-            if days_until_due <= 7:
-                return 90 - (days_until_due * 5)
-            
-            # Due within 2 weeks - moderate urgency
-            if days_until_due <= 14:
-                return 60 - ((days_until_due - 7) * 3)
-            
-            # Due within a month - lower urgency
-            if days_until_due <= 30:
-                return 40 - ((days_until_due - 14) * 1.5)
-            
-            # Far future - minimal urgency
-            return max(10.0, 40 - (days_until_due - 30) * 0.5)
-            
-        except (ValueError, TypeError):
-            return 50.0  # Neutral score for invalid dates
+        if isinstance(due_date_str, str):
+            try:
+                return datetime.strptime(due_date_str, '%Y-%m-%d').date()
+            except ValueError:
+                return None
+        
+        # Plain dates only (a datetime can't be subtracted from a date)
+        if isinstance(due_date_str, date) and not isinstance(due_date_str, datetime):
+            return due_date_str
+        return None
+    
+    def _urgency_for_days(self, days_until_due: int) -> float:
+        """Urgency for a due date that is days_until_due days away."""
+        # Overdue tasks
+        if days_until_due < 0:
+            # More overdue = higher urgency (caps at 100)
+            return min(100.0, 100 + abs(days_until_due) * 5)
+        
+        # Due today
+        if days_until_due == 0:
+            return 95.0
+        
+        # Due within a week - high urgency
+        if days_until_due <= 7:
+            return 90 - (days_until_due * 5)
+        
+        # Due within 2 weeks - moderate urgency
+        if days_until_due <= 14:
+            return 60 - ((days_until_due - 7) * 3)
+        
+        # Due within a month - lower urgency
+        if days_until_due <= 30:
+            return 40 - ((days_until_due - 14) * 1.5)
+        
+        # Far future - minimal urgency
+        return max(10.0, 40 - (days_until_due - 30) * 0.5)
     
     def _calculate_importance(self, task: Dict[str, Any]) -> float:
         """
@@ -111,6 +183,10 @@ class TaskScorer:
         if not isinstance(importance, (int, float)):
             return 50.0
         
+        return self._importance_for(importance)
+    
+    def _importance_for(self, importance: float) -> float:
+        """Importance score for a numeric importance rating."""
         importance = max(1, min(10, importance))
         
         # Convert to 0-100 scale with slight curve favoring high importance
@@ -123,7 +199,14 @@ class TaskScorer:
         """
         estimated_hours = task.get('estimated_hours', 5)
         
-        if not isinstance(estimated_hours, (int, float)) or estimated_hours <= 0:
+        if not isinstance(estimated_hours, (int, float)):
+            return 50.0
+        
+        return self._effort_for(estimated_hours)
+    
+    def _effort_for(self, estimated_hours: float) -> float:
+        """Effort score for a numeric number of hours."""
+        if estimated_hours <= 0:
             return 50.0
         
         # Quick tasks (< 2 hours) get a boost
@@ -138,7 +221,8 @@ class TaskScorer:
         return max(30.0, 50 - (estimated_hours - 8) * 2)
     
     def _calculate_dependency_score(self, task: Dict[str, Any], 
-                                    all_tasks: List[Dict[str, Any]]) -> float:
+                                    all_tasks: List[Dict[str, Any]],
+                                    blocked_counts: Dict[int, int] = None) -> float:
         """
         Tasks that block other tasks should be prioritized.
         """
@@ -146,14 +230,20 @@ class TaskScorer:
         if not task_id:
             return 50.0
         
-        # Count how many other tasks depend on this one
-        blocked_count = 0
-        for other_task in all_tasks:
-            dependencies = other_task.get('dependencies', [])
-            if task_id in dependencies:
-                blocked_count += 1
+        if blocked_counts is not None:
+            blocked_count = blocked_counts.get(task_id, 0)
+        else:
+            # Count how many other tasks depend on this one
+            blocked_count = 0
+            for other_task in all_tasks:
+                dependencies = other_task.get('dependencies', [])
+                if task_id in dependencies:
+                    blocked_count += 1
         
-        # Score based on number of blocked tasks
+        return self._score_blocked_count(blocked_count)
+    
+    def _score_blocked_count(self, blocked_count: int) -> float:
+        """Score based on number of blocked tasks."""
         if blocked_count == 0:
             return 40.0
         elif blocked_count == 1:
@@ -163,6 +253,22 @@ class TaskScorer:
         else:
             return min(100.0, 75 + (blocked_count - 2) * 10)
     
+    def count_blocked_tasks(self, tasks: List[Dict[str, Any]]) -> Dict[int, int]:
+        """
+        Count, in a single pass, how many tasks depend on each task id.
+        """
+        blocked_counts = {}
+        for task in tasks:
+            dependencies = task.get('dependencies')
+            if not dependencies:
+                continue
+            # A task listing the same dependency twice still blocks on it once
+            if len(dependencies) > 1:
+                dependencies = set(dependencies)
+            for dep_id in dependencies:
+                blocked_counts[dep_id] = blocked_counts.get(dep_id, 0) + 1
+        return blocked_counts
+    
     # Alternative scoring strategies
     
     def _fastest_wins_score(self, task: Dict[str, Any]) -> float:
@@ -190,6 +296,60 @@ class TaskScorer:
         
         return urgency_score * 0.80 + importance_score * 0.20
     
+    def forecast_scores(self, tasks: List[Dict[str, Any]], as_of_dates: List[date],
+                        blocked_counts: Dict[int, int] = None) -> List[List[float]]:
+        """
+        Score every task as of each date in a single batch.
+        
+        Returns a days x tasks matrix (one row per date, tasks in input
+        order) matching calculate_priority_score with as_of set to that date.
+        Only urgency depends on the date, so the importance, effort and
+        dependency components are computed once per task.
+        """
+        strategy = self.strategy if self.strategy in self.STRATEGY_WEIGHTS else 'smart_balance'
+        weights = self.STRATEGY_WEIGHTS[strategy]
+        if blocked_counts is None:
+            blocked_counts = self.count_blocked_tasks(tasks)
+        
+        # Weighted date-independent terms in summing order, with None as the
+        # urgency placeholder, so each day's sum matches the strategy exactly
+        components = {
+            'importance': self._calculate_importance,
+            'effort': self._calculate_effort_score,
+            'dependency': lambda task: self._calculate_dependency_score(task, [], blocked_counts),
+        }
+        urgency_weight = dict(weights).get('urgency', 0.0)
+        task_terms = []
+        due_ordinals = []
+        for task in tasks:
+            task_terms.append([
+                None if name == 'urgency' else components[name](task) * weight
+                for name, weight in weights
+            ])
+            due_date = self._parse_due_date(task)
+            due_ordinals.append(due_date.toordinal() if due_date else None)
+        
+        matrix = []
+        for as_of in as_of_dates:
+            day = as_of.toordinal()
+            urgency_by_days = {}
+            row = []
+            for terms, due in zip(task_terms, due_ordinals):
+                if due is None:
+                    urgency = 50.0
+                else:
+                    urgency = urgency_by_days.get(due - day)
+                    if urgency is None:
+                        urgency = urgency_by_days[due - day] = self._urgency_for_days(due - day)
+                
+                total = 0.0
+                for term in terms:
+                    total += urgency * urgency_weight if term is None else term
+                row.append(round(total, 2) if strategy == 'smart_balance' else total)
+            matrix.append(row)
+        
+        return matrix
+    
     def detect_circular_dependencies(self, tasks: List[Dict[str, Any]]) -> List[List[int]]:
         """
         Detect circular dependencies using depth-first search.
@@ -202,30 +362,51 @@ class TaskScorer:
             if task_id:
                 graph[task_id] = task.get('dependencies', [])
         
-        def dfs(node, visited, rec_stack, path):
-            visited.add(node)
-            rec_stack.add(node)
-            path.append(node)
+        return self.find_cycles(graph)
+    
+    def find_cycles(self, graph: Dict[int, List[int]],
+                    roots: Iterable[int] = None) -> List[List[int]]:
+        """
+        Find cycles in a task id -> dependency ids graph.
+        
+        When roots is given, only the part of the graph reachable from those
+        ids is searched. Any cycle introduced by changing a task's
+        dependencies must pass through that task, so passing the changed ids
+        is enough to re-check an already acyclic graph.
+        """
+        def dfs(root, visited):
+            # Iterative, so long dependency chains can't hit the recursion
+            # limit. path is the current DFS path; on_path maps each node on
+            # it to its position there.
+            visited.add(root)
+            path = [root]
+            on_path = {root: 0}
+            stack = [iter(graph.get(root, []))]
             
-            for neighbor in graph.get(node, []):
-                if neighbor not in visited:
-                    cycle = dfs(neighbor, visited, rec_stack, path[:])
-                    if cycle:
-                        return cycle
-                elif neighbor in rec_stack:
-                    # Found a cycle
-                    cycle_start = path.index(neighbor)
-                    return path[cycle_start:] + [neighbor]
+            while stack:
+                for neighbor in stack[-1]:
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        on_path[neighbor] = len(path)
+                        path.append(neighbor)
+                        stack.append(iter(graph.get(neighbor, [])))
+                        break
+                    elif neighbor in on_path:
+                        # Found a cycle
+                        return path[on_path[neighbor]:] + [neighbor]
+                else:
+                    # All dependencies explored, backtrack
+                    stack.pop()
+                    del on_path[path.pop()]
             
-            rec_stack.remove(node)
             return None
         
         cycles = []
         visited = set()
         
-        for task_id in graph.keys():
+        for task_id in (graph.keys() if roots is None else roots):
             if task_id not in visited:
-                cycle = dfs(task_id, visited, set(), [])
+                cycle = dfs(task_id, visited)
                 if cycle and cycle not in cycles:
                     cycles.append(cycle)
         
@@ -233,40 +414,22 @@ class TaskScorer:
     
     def generate_explanation(self, task: Dict[str, Any], score: float) -> str:
         """Generate human-readable explanation for the score."""
-        reasons = []
-        
-        # Check urgency
-        due_date_str = task.get('due_date')
-        if due_date_str:
-            try:
-                if isinstance(due_date_str, str):
-                    due_date = datetime.strptime(due_date_str, '%Y-%m-%d').date()
-                else:
-                    due_date = due_date_str
-                days_until = (due_date - date.today()).days
-                
-                if days_until < 0:
-                    reasons.append(f"Overdue by {abs(days_until)} days")
-                elif days_until == 0:
-                    reasons.append("Due today")
-                elif days_until <= 3:
-                    reasons.append(f"Due in {days_until} days")
-            except:
-                pass
-        
-        # Check importance
-        importance = task.get('importance', 5)
-        if importance >= 8:
-            reasons.append("High importance")
-        
         # Check effort
         effort = task.get('estimated_hours', 0)
         if effort <= 2:
-            reasons.append("Quick win")
+            effort_reason = "Quick win"
         elif effort >= 10:
-            reasons.append("Large task")
+            effort_reason = "Large task"
+        else:
+            effort_reason = None
         
-        if not reasons:
-            reasons.append("Balanced priority")
+        # Only the last few days before the deadline get a reason
+        days_until = self._days_until_due(task)
+        if days_until is not None and days_until > 3:
+            days_until = None
         
-        return " • ".join(reasons)
\ No newline at end of file
+        return _explanation_text(
+            days_until,
+            task.get('importance', 5) >= 8,
+            effort_reason
+        )
@@ -1,6 +1,33 @@
 from rest_framework import serializers
 from .models import Task
 
+STRATEGY_CHOICES = ['smart_balance', 'fastest_wins', 'high_impact', 'deadline_driven']
+
+class ExplainField(serializers.Field):
+    """
+    Which tasks get an explanation: "all" (default), "none", or a number K
+    for only the top K tasks of the ranking.
+    """
+    default_error_messages = {
+        'invalid': 'Expected "all", "none" or a non-negative number of tasks.'
+    }
+    
+    def to_internal_value(self, data):
+        if data in ('all', 'none'):
+            return data
+        if isinstance(data, bool):
+            self.fail('invalid')
+        try:
+            top_k = int(data)
+        except (TypeError, ValueError):
+            self.fail('invalid')
+        if top_k < 0 or str(top_k) != str(data).strip():
+            self.fail('invalid')
+        return top_k
+    
+    def to_representation(self, value):
+        return value
+
 class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
@@ -10,9 +37,35 @@ class TaskSerializer(serializers.ModelSerializer):
 class TaskAnalysisSerializer(serializers.Serializer):
     tasks = TaskSerializer(many=True)
     strategy = serializers.ChoiceField(
-        choices=['smart_balance', 'fastest_wins', 'high_impact', 'deadline_driven'],
+        choices=STRATEGY_CHOICES,
         default='smart_balance'
     )
+    explain = ExplainField(default='all')
+
+class ForecastSerializer(TaskAnalysisSerializer):
+    explain = None  # forecasts only return scores
+    start_date = serializers.DateField(required=False)
+    days = serializers.IntegerField(min_value=1, max_value=90, default=7)
+
+class BatchListSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=255)
+    # Taken as raw JSON and validated per list (TaskAnalysisSerializer), so a
+    # malformed list is reported under its name instead of failing the batch
+    tasks = serializers.JSONField(required=False, allow_null=True)
+    strategy = serializers.JSONField(required=False, allow_null=True)
+    explain = serializers.JSONField(required=False, allow_null=True)
+
+class BatchAnalysisSerializer(serializers.Serializer):
+    lists = BatchListSerializer(many=True)
+    strategy = serializers.ChoiceField(choices=STRATEGY_CHOICES, default='smart_balance')
+    explain = ExplainField(default='all')
+    workers = serializers.IntegerField(min_value=1, default=1)
+    
+    def validate_lists(self, value):
+        names = [item['name'] for item in value]
+        if len(names) != len(set(names)):
+            raise serializers.ValidationError('List names must be unique.')
+        return value
 
 class TaskWithScoreSerializer(serializers.Serializer):
     id = serializers.IntegerField(required=False, allow_null=True)
@@ -22,4 +75,27 @@ class TaskWithScoreSerializer(serializers.Serializer):
     importance = serializers.IntegerField()
     dependencies = serializers.ListField(child=serializers.IntegerField(), default=list)
     priority_score = serializers.FloatField(read_only=True)
-    explanation = serializers.CharField(read_only=True)
\ No newline at end of file
+    explanation = serializers.CharField(read_only=True)
+
+class SessionTaskSerializer(TaskSerializer):
+    # Ids are client supplied inside a session so later deltas can refer to them
+    id = serializers.IntegerField(required=False, min_value=1)
+
+class SessionTaskUpdateSerializer(SessionTaskSerializer):
+    id = serializers.IntegerField(min_value=1)
+
+    class Meta(SessionTaskSerializer.Meta):
+        extra_kwargs = {
+            field: {'required': False}
+            for field in ['title', 'due_date', 'estimated_hours', 'importance']
+        }
+
+class SessionCreateSerializer(serializers.Serializer):
+    tasks = SessionTaskSerializer(many=True)
+    strategy = serializers.ChoiceField(choices=STRATEGY_CHOICES, default='smart_balance')
+
+class SessionDeltaSerializer(serializers.Serializer):
+    add = SessionTaskSerializer(many=True, default=list)
+    update = SessionTaskUpdateSerializer(many=True, default=list)
+    remove = serializers.ListField(child=serializers.IntegerField(), default=list)
+    strategy = serializers.ChoiceField(choices=STRATEGY_CHOICES, required=False)
@@ -0,0 +1,172 @@
+from typing import List, Dict, Any, Iterable
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Task, TaskDependency
+from .scoring import TaskScorer
+
+# Rows per UPDATE/INSERT statement; keeps SQLite's variable limit in reach
+BATCH_SIZE = 500
+
+SCORE_FIELDS = ['priority_score', 'explanation', 'scored_at']
+
+
+class CircularDependencyError(ValueError):
+    """Raised when a write would make stored tasks depend on themselves."""
+    
+    def __init__(self, cycles: List[List[int]]):
+        super().__init__('Circular dependencies detected')
+        self.cycles = cycles
+
+
+def task_to_dict(task: Task) -> Dict[str, Any]:
+    """Convert a stored Task to the dict TaskScorer works on."""
+    return {
+        'id': task.pk,
+        'title': task.title,
+        'due_date': task.due_date,
+        'estimated_hours': task.estimated_hours,
+        'importance': task.importance,
+        'dependencies': task.dependencies
+    }
+
+
+def save_tasks(tasks_data: List[Dict[str, Any]]) -> List[Task]:
+    """
+    Store validated tasks and their dependency edges in one short write
+    transaction. Raises CircularDependencyError (and stores nothing) if the
+    new tasks close a cycle, e.g. with tasks that already named their ids.
+    """
+    tasks = [Task(**task_data) for task_data in tasks_data]
+    with transaction.atomic():
+        tasks = Task.objects.bulk_create(tasks, batch_size=BATCH_SIZE)
+        TaskDependency.objects.bulk_create(
+            [edge for task in tasks for edge in TaskDependency.edges_for(task)],
+            batch_size=BATCH_SIZE
+        )
+        cycles = find_cycles([task.pk for task in tasks])
+        if cycles:
+            raise CircularDependencyError(cycles)
+    return tasks
+
+
+def set_dependencies(task: Task, dependencies: List[int]):
+    """
+    Replace a stored task's dependencies, refusing changes that would
+    create a cycle. A refused change is rolled back on the task object as
+    well, so a later task.save() can't store it.
+    """
+    previous = task.dependencies
+    try:
+        with transaction.atomic():
+            task.dependencies = dependencies
+            task.save(update_fields=['dependencies'])
+            cycles = find_cycles([task.pk])
+            if cycles:
+                raise CircularDependencyError(cycles)
+    except Exception:
+        task.dependencies = previous
+        raise
+
+
+def count_blocked_tasks(task_ids: Iterable[int] = None) -> Dict[int, int]:
+    """
+    How many stored tasks depend on each task id (only task_ids if given).
+    A grouped count over the dependency index, not a scan of every task.
+    """
+    edges = TaskDependency.objects.all()
+    if task_ids is not None:
+        edges = edges.filter(depends_on__in=list(task_ids))
+    return dict(
+        edges.order_by().values('depends_on')
+        .annotate(blocked=Count('id')).values_list('depends_on', 'blocked')
+    )
+
+
+def tasks_blocked_by(task_id: int, transitive: bool = False) -> List[int]:
+    """
+    Ids of the stored tasks that depend on task_id ("what does this block").
+    With transitive=True, also the tasks depending on those, and so on.
+    """
+    if not transitive:
+        return list(
+            TaskDependency.objects.filter(depends_on=task_id)
+            .order_by('task_id').values_list('task_id', flat=True)
+        )
+    
+    table = connection.ops.quote_name(TaskDependency._meta.db_table)
+    with connection.cursor() as cursor:
+        # UNION (not UNION ALL) drops ids already seen, so cycles terminate
+        cursor.execute(f"""
+            WITH RECURSIVE blocked(id) AS (
+                SELECT task_id FROM {table} WHERE depends_on = %s
+                UNION
+                SELECT edge.task_id FROM {table} edge
+                JOIN blocked ON edge.depends_on = blocked.id
+            )
+            SELECT id FROM blocked ORDER BY id
+        """, [task_id])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def find_cycles(task_ids: List[int]) -> List[List[int]]:
+    """
+    Cycles reachable from the given stored tasks.
+    
+    Only the edges reachable from task_ids are loaded (a recursive query
+    over the dependency index); the search itself is TaskScorer's. Any new
+    cycle must pass through a task whose dependencies changed, so checking
+    those tasks after a write is enough.
+    """
+    table = connection.ops.quote_name(TaskDependency._meta.db_table)
+    graph = {}
+    for start in range(0, len(task_ids), BATCH_SIZE):
+        roots = task_ids[start:start + BATCH_SIZE]
+        placeholders = ', '.join(['(%s)'] * len(roots))
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                WITH RECURSIVE roots(id) AS (VALUES {placeholders}),
+                reachable(id) AS (
+                    SELECT id FROM roots
+                    UNION
+                    SELECT edge.depends_on FROM {table} edge
+                    JOIN reachable ON edge.task_id = reachable.id
+                )
+                SELECT edge.task_id, edge.depends_on FROM {table} edge
+                JOIN reachable ON edge.task_id = reachable.id
+            """, roots)
+            for task_id, depends_on in cursor.fetchall():
+                graph.setdefault(task_id, []).append(depends_on)
+    
+    return TaskScorer().find_cycles(graph, task_ids)
+
+
+def refresh_scores(strategy: str = 'smart_balance', task_ids: List[int] = None) -> int:
+    """
+    Recalculate and store the priority score of stored tasks.
+
+    Dependencies are counted over all stored tasks (from the dependency
+    index), but only task_ids (all tasks by default) are rewritten. Scoring
+    happens before the write transaction opens, and the updates go out with
+    bulk_update, so the write lock is held for a handful of statements
+    rather than one per task. Returns the number of tasks updated.
+    """
+    scorer = TaskScorer(strategy=strategy)
+    if task_ids is None:
+        tasks = list(Task.objects.order_by())
+    else:
+        tasks = list(Task.objects.filter(pk__in=task_ids).order_by())
+    blocked_counts = count_blocked_tasks(task_ids)
+
+    scored_at = timezone.now()
+    for task in tasks:
+        task_dict = task_to_dict(task)
+        task.priority_score = scorer.calculate_priority_score(task_dict, blocked_counts=blocked_counts)
+        task.explanation = scorer.generate_explanation(task_dict, task.priority_score)
+        task.scored_at = scored_at
+
+    with transaction.atomic():
+        Task.objects.bulk_update(tasks, SCORE_FIELDS, batch_size=BATCH_SIZE)
+    return len(tasks)
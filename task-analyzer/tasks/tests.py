@@ -1,6 +1,22 @@
-from django.test import TestCase
+import gc
+import math
+import random
+import statistics
+import time
+import tracemalloc
+from django.test import SimpleTestCase, TestCase, override_settings
 from datetime import date, timedelta
 from .scoring import TaskScorer
+from .batch import analyze_task_list, get_pool, shutdown_pool
+from .delta import (
+    AnalysisSession, SessionConflict, load_session, save_session, session_lock
+)
+from .parallel import rank_tasks
+from .models import Task, TaskDependency
+from .storage import (
+    save_tasks, refresh_scores, task_to_dict, set_dependencies,
+    count_blocked_tasks, tasks_blocked_by, CircularDependencyError
+)
 
 class TaskScorerTestCase(TestCase):
     
@@ -153,4 +169,605 @@ class TaskScorerTestCase(TestCase):
         
         # High importance task should score highest with high_impact strategy
         self.assertGreater(score_impact, score_fastest, 
-                          "High importance task should score better with impact strategy")
\ No newline at end of file
+                          "High importance task should score better with impact strategy")
+
+
+class ForecastTestCase(TestCase):
+    
+    def setUp(self):
+        self.today = date.today()
+        self.tasks = [
+            {
+                'id': i,
+                'title': f'Task {i}',
+                'due_date': (self.today + timedelta(days=i * 4 - 6)).strftime('%Y-%m-%d'),
+                'estimated_hours': i,
+                'importance': 11 - i,
+                'dependencies': [1] if i > 2 else []
+            }
+            for i in range(1, 9)
+        ]
+        self.tasks.append({'id': 9, 'title': 'No date', 'estimated_hours': 2,
+                           'importance': 5, 'dependencies': []})
+    
+    def test_forecast_matches_per_day_scoring(self):
+        """Each forecast row should equal scoring the tasks as of that day."""
+        dates = [self.today + timedelta(days=offset) for offset in range(-3, 40, 3)]
+        
+        for strategy in TaskScorer.STRATEGY_WEIGHTS:
+            matrix = TaskScorer(strategy=strategy).forecast_scores(self.tasks, dates)
+            for as_of, row in zip(dates, matrix):
+                scorer = TaskScorer(strategy=strategy, as_of=as_of)
+                expected = [scorer.calculate_priority_score(task, self.tasks)
+                            for task in self.tasks]
+                self.assertEqual(row, expected)
+    
+    def test_forecast_endpoint_rank_changes(self):
+        """The endpoint should return one ranking per day with rank changes."""
+        payload = {'tasks': self.tasks[:8], 'days': 5, 'strategy': 'deadline_driven'}
+        response = self.client.post('/api/tasks/forecast/', payload,
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        
+        forecast = response.json()['forecast']
+        self.assertEqual(len(forecast), 5)
+        self.assertEqual(forecast[0]['date'], self.today.isoformat())
+        self.assertIsNone(forecast[0]['ranking'][0]['rank_change'])
+        for day in forecast[1:]:
+            self.assertEqual(len(day['ranking']), 8)
+            self.assertEqual(sum(entry['rank_change'] for entry in day['ranking']), 0)
+
+
+class AnalysisSessionTestCase(TestCase):
+    
+    def setUp(self):
+        self.today = date.today()
+        self.tasks = [
+            {
+                'id': i,
+                'title': f'Task {i}',
+                'due_date': self.today + timedelta(days=i),
+                'estimated_hours': 3,
+                'importance': 5,
+                'dependencies': [1] if i > 1 else []
+            }
+            for i in range(1, 6)
+        ]
+    
+    def test_delta_matches_full_rescore(self):
+        """Scores after a delta should equal scoring the final list from scratch."""
+        session = AnalysisSession()
+        session.apply(add=self.tasks)
+        session.apply(
+            update=[{'id': 3, 'importance': 9, 'dependencies': [2]}],
+            remove=[5],
+            add=[{'title': 'New', 'due_date': self.today, 'estimated_hours': 1,
+                  'importance': 7, 'dependencies': [2]}]
+        )
+        
+        final_tasks = list(session.tasks.values())
+        scorer = TaskScorer()
+        for task in final_tasks:
+            self.assertEqual(session.results[task['id']]['priority_score'],
+                             scorer.calculate_priority_score(task, final_tasks))
+        self.assertIn(6, session.results)
+        self.assertNotIn(5, session.results)
+    
+    def test_delta_rescores_only_affected_tasks(self):
+        """Editing one task should only rescore it and the tasks it blocks."""
+        session = AnalysisSession()
+        session.apply(add=self.tasks)
+        session.apply(update=[{'id': 4, 'dependencies': [2]}])
+        
+        # Task 4 itself, plus tasks 1 and 2 whose blocked counts changed
+        self.assertEqual(session.last_rescored, 3)
+    
+    def test_delta_detects_new_cycle(self):
+        """A delta closing a loop should be reported as a cycle."""
+        session = AnalysisSession()
+        session.apply(add=self.tasks)
+        cycles = session.apply(update=[{'id': 1, 'dependencies': [3]}])
+        self.assertTrue(len(cycles) > 0, "Should detect circular dependency")
+    
+    def test_session_api_round_trip(self):
+        """Sessions can be created and updated over the API."""
+        payload = {'tasks': [
+            {**task, 'due_date': task['due_date'].isoformat()} for task in self.tasks
+        ]}
+        response = self.client.post('/api/tasks/sessions/', payload,
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        token = response.json()['session']
+        
+        response = self.client.post(f'/api/tasks/sessions/{token}/',
+                                    {'remove': [2, 3]},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_tasks'], 3)
+        
+        response = self.client.post(f'/api/tasks/sessions/{token}/',
+                                    {'remove': [2]},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_session_ids_mixed_with_missing(self):
+        """Tasks without an id should get one no other task in the list uses."""
+        tasks = [{**task, 'due_date': task['due_date'].isoformat()} for task in self.tasks[:2]]
+        del tasks[0]['id']
+        tasks[1]['dependencies'] = []
+        response = self.client.post('/api/tasks/sessions/', {'tasks': tasks},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sorted(task['id'] for task in response.json()['tasks']), [2, 3])
+    
+    @override_settings(TASK_ANALYSIS_SESSION_LOCK_WAIT=0.1)
+    def test_busy_session_is_not_overwritten(self):
+        """A delta arriving while another one holds the session gets a 409."""
+        session = AnalysisSession()
+        session.apply(add=self.tasks)
+        save_session(session)
+        
+        stale = load_session(session.token)
+        with session_lock(session.token):
+            response = self.client.post(f'/api/tasks/sessions/{session.token}/',
+                                        {'remove': [5]},
+                                        content_type='application/json')
+            self.assertEqual(response.status_code, 409)
+            
+            current = load_session(session.token)
+            current.apply(remove=[4])
+            save_session(current)
+        
+        stale.apply(remove=[3])
+        with self.assertRaises(SessionConflict):
+            save_session(stale)
+        self.assertEqual(set(load_session(session.token).tasks), {1, 2, 3, 5})
+    
+    def test_sessions_outlive_default_cache_cap(self):
+        """More sessions than a default cache holds (300 entries) stay loadable."""
+        sessions = []
+        for _ in range(400):
+            session = AnalysisSession()
+            session.apply(add=self.tasks)
+            save_session(session)
+            sessions.append(session)
+        
+        self.assertIsNotNone(load_session(sessions[0].token))
+        self.assertIsNotNone(load_session(sessions[-1].token))
+
+
+class BatchAnalysisTestCase(TestCase):
+    
+    def setUp(self):
+        today = date.today()
+        self.tasks = [
+            {
+                'title': f'Task {i}',
+                'due_date': (today + timedelta(days=i)).strftime('%Y-%m-%d'),
+                'estimated_hours': i,
+                'importance': 5,
+                'dependencies': [1] if i > 1 else []
+            }
+            for i in range(1, 4)
+        ]
+    
+    @classmethod
+    def tearDownClass(cls):
+        # Stop the pool's manager thread so later tests can fork safely
+        shutdown_pool()
+        super().tearDownClass()
+    
+    def _post_batch(self, workers):
+        cyclic = [{**task, 'dependencies': [(i + 1) % 3 + 1]}
+                  for i, task in enumerate(self.tasks)]
+        payload = {
+            'lists': [
+                {'name': 'good', 'tasks': self.tasks},
+                {'name': 'cyclic', 'tasks': cyclic},
+                {'name': 'invalid', 'tasks': [{'title': 'Missing fields'}]},
+                {'name': 'fast', 'tasks': self.tasks, 'strategy': 'fastest_wins'}
+            ],
+            'workers': workers
+        }
+        return self.client.post('/api/tasks/analyze/batch/', payload,
+                                content_type='application/json')
+    
+    def test_batch_isolates_failing_lists(self):
+        """Cycles or invalid data in one list should not fail the others."""
+        response = self._post_batch(workers=1)
+        self.assertEqual(response.status_code, 200)
+        
+        body = response.json()
+        self.assertEqual(set(body['results']), {'good', 'fast'})
+        self.assertEqual(set(body['errors']), {'cyclic', 'invalid'})
+        self.assertIn('cycles', body['errors']['cyclic'])
+        self.assertEqual(body['results']['fast']['strategy_used'], 'fastest_wins')
+        
+        single = self.client.post('/api/tasks/analyze/', {'tasks': self.tasks},
+                                  content_type='application/json')
+        self.assertEqual(body['results']['good'], single.json())
+    
+    def test_batch_worker_pool_matches_serial(self):
+        """Scoring across worker processes should give the same results."""
+        self.assertEqual(self._post_batch(workers=2).json(),
+                         self._post_batch(workers=1).json())
+        # The pool outlives the request
+        pool = get_pool()
+        self._post_batch(workers=2)
+        self.assertIs(get_pool(), pool)
+    
+    def test_batch_reports_malformed_lists(self):
+        """Malformed tasks, strategy or explain should only fail their own list."""
+        payload = {
+            'lists': [
+                {'name': 'good', 'tasks': self.tasks},
+                {'name': 'not-objects', 'tasks': ['x']},
+                {'name': 'not-a-list', 'tasks': {'title': 'Task'}},
+                {'name': 'no-tasks'},
+                {'name': 'null-strategy', 'tasks': self.tasks, 'strategy': None},
+                {'name': 'null-explain', 'tasks': self.tasks, 'explain': None}
+            ]
+        }
+        response = self.client.post('/api/tasks/analyze/batch/', payload,
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        
+        body = response.json()
+        self.assertEqual(set(body['results']), {'good'})
+        self.assertEqual(set(body['errors']), {
+            'not-objects', 'not-a-list', 'no-tasks', 'null-strategy', 'null-explain'
+        })
+        self.assertIn('tasks', body['errors']['not-a-list'])
+        self.assertIn('strategy', body['errors']['null-strategy'])
+        self.assertIn('explain', body['errors']['null-explain'])
+
+
+class TaskStorageTestCase(TestCase):
+    
+    def test_refresh_scores_batches_updates(self):
+        """Stored scores should match the scorer and be written in bulk."""
+        today = date.today()
+        tasks = save_tasks([
+            {
+                'title': f'Task {i}',
+                'due_date': today + timedelta(days=i),
+                'estimated_hours': 2 + i,
+                'importance': 1 + i % 10,
+                'dependencies': []
+            }
+            for i in range(20)
+        ])
+        first = tasks[0]
+        for task in tasks[1:4]:
+            set_dependencies(task, [first.pk])
+        
+        # Load tasks, count dependents from the index, then a single bulk
+        # UPDATE (inside a test savepoint)
+        with self.assertNumQueries(5):
+            updated = refresh_scores()
+        self.assertEqual(updated, 20)
+        
+        stored = list(Task.objects.all())
+        all_tasks = [task_to_dict(task) for task in stored]
+        scorer = TaskScorer()
+        for task in stored:
+            self.assertEqual(task.priority_score,
+                             scorer.calculate_priority_score(task_to_dict(task), all_tasks))
+            self.assertIsNotNone(task.scored_at)
+        # Blocking three tasks should lift the first task above its own
+        # score with no dependents
+        unblocked = scorer.calculate_priority_score(task_to_dict(first), blocked_counts={})
+        self.assertGreater(Task.objects.get(pk=first.pk).priority_score, unblocked)
+
+
+class ExplanationTestCase(TestCase):
+    
+    def setUp(self):
+        today = date.today()
+        self.tasks = [
+            {
+                'title': f'Task {i}',
+                'due_date': (today + timedelta(days=i % 5)).strftime('%Y-%m-%d'),
+                'estimated_hours': 1 + i % 12,
+                'importance': 1 + i % 10,
+                'dependencies': []
+            }
+            for i in range(30)
+        ]
+    
+    def _analyze(self, explain):
+        response = self.client.post('/api/tasks/analyze/',
+                                    {'tasks': self.tasks, 'explain': explain},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['tasks']
+    
+    def test_explain_modes(self):
+        """Explanations can be skipped or limited to the top K tasks."""
+        everything = self._analyze('all')
+        self.assertTrue(all('explanation' in task for task in everything))
+        
+        self.assertFalse(any('explanation' in task for task in self._analyze('none')))
+        
+        top = self._analyze(5)
+        self.assertEqual([task.get('explanation') for task in top[:5]],
+                         [task['explanation'] for task in everything[:5]])
+        self.assertFalse(any('explanation' in task for task in top[5:]))
+        
+        response = self.client.post('/api/tasks/analyze/',
+                                    {'tasks': self.tasks, 'explain': 'some'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_explanations_are_shared(self):
+        """Tasks with the same reasons should share one explanation string."""
+        scorer = TaskScorer()
+        first = {'due_date': date.today(), 'importance': 9, 'estimated_hours': 1}
+        second = dict(first)
+        self.assertEqual(scorer.generate_explanation(first, 0),
+                         'Due today • High importance • Quick win')
+        self.assertIs(scorer.generate_explanation(first, 0),
+                      scorer.generate_explanation(second, 0))
+
+
+class DependencyIndexTestCase(TestCase):
+    
+    def _chain(self, length):
+        """Store tasks where each one depends on the previous one."""
+        tasks = []
+        for i in range(length):
+            task = Task(title=f'Task {i}', due_date=date.today(), estimated_hours=1,
+                        importance=5, dependencies=[tasks[-1].pk] if tasks else [])
+            task.save()
+            tasks.append(task)
+        return tasks
+    
+    def test_dependency_index_follows_saves(self):
+        """Edges should track Task.save() and be removed with the task."""
+        first, second, third = self._chain(3)
+        self.assertEqual(tasks_blocked_by(first.pk), [second.pk])
+        
+        third.dependencies = [first.pk, first.pk]
+        third.save()
+        self.assertEqual(tasks_blocked_by(first.pk), [second.pk, third.pk])
+        self.assertEqual(count_blocked_tasks(), {first.pk: 2})
+        
+        second.delete()
+        self.assertEqual(tasks_blocked_by(first.pk), [third.pk])
+    
+    def test_transitive_blocks_and_cycles(self):
+        """Transitive lookups and cycle checks should use the index."""
+        tasks = self._chain(5)
+        ids = [task.pk for task in tasks]
+        self.assertEqual(tasks_blocked_by(ids[0], transitive=True), ids[1:])
+        
+        with self.assertRaises(CircularDependencyError) as raised:
+            set_dependencies(tasks[0], [ids[4]])
+        self.assertTrue(len(raised.exception.cycles) > 0)
+        self.assertEqual(Task.objects.get(pk=ids[0]).dependencies, [])
+        self.assertFalse(TaskDependency.objects.filter(task_id=ids[0]).exists())
+        
+        # The refused list must not linger on the object for the next save
+        self.assertEqual(tasks[0].dependencies, [])
+        tasks[0].title = 'Renamed'
+        tasks[0].save()
+        self.assertFalse(TaskDependency.objects.filter(task_id=ids[0]).exists())
+        
+        response = self.client.get(f'/api/tasks/{ids[2]}/blocks/')
+        self.assertEqual(response.json()['blocks'], [ids[3]])
+        self.assertEqual(response.json()['blocks_transitively'], ids[3:])
+
+
+class ParallelScoringTestCase(TestCase):
+    
+    def setUp(self):
+        self.tasks = _make_tasks(3000)
+        # Values the scorer treats as missing or invalid
+        self.tasks[3]['importance'] = 'high'
+        self.tasks[4]['estimated_hours'] = None
+        self.tasks[5]['due_date'] = 'not a date'
+        self.tasks[6]['id'] = None
+        del self.tasks[7]['due_date']
+    
+    def test_rank_tasks_matches_serial_scoring(self):
+        """Shared-memory scoring should reproduce the serial scores and order."""
+        for strategy in TaskScorer.STRATEGY_WEIGHTS:
+            scorer = TaskScorer(strategy=strategy)
+            blocked_counts = scorer.count_blocked_tasks(self.tasks)
+            expected = [scorer.calculate_priority_score(task, blocked_counts=blocked_counts)
+                        for task in self.tasks]
+            expected_order = sorted(range(len(self.tasks)),
+                                    key=expected.__getitem__, reverse=True)
+            
+            for workers in (1, 3):
+                order, scores = rank_tasks(self.tasks, strategy, workers=workers)
+                self.assertEqual(scores, expected)
+                self.assertEqual(order, expected_order)
+    
+    def test_parallel_analysis_matches_serial(self):
+        """analyze_task_list with workers should return the same response."""
+        tasks = _make_tasks(3000, seed=1)
+        self.assertEqual(analyze_task_list(tasks, workers=2),
+                         analyze_task_list(tasks))
+    
+    def test_parallel_analysis_uses_callers_scorer(self):
+        """Strategy and date should come from the passed scorer on both paths."""
+        tasks = _make_tasks(500, seed=2)
+        as_of = date.today() + timedelta(days=30)
+        for strategy in ('smart_balance', 'fastest_wins'):
+            scorer = TaskScorer(strategy=strategy, as_of=as_of)
+            parallel = analyze_task_list(tasks, scorer=scorer, workers=2)
+            self.assertEqual(parallel, analyze_task_list(tasks, scorer=scorer))
+            self.assertEqual(parallel['strategy_used'], strategy)
+
+
+def _make_tasks(count, chain=False, seed=0):
+    """
+    Generate tasks for scaling tests: each task depends on up to two
+    earlier tasks (acyclic), or on the previous one when chain is True.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    tasks = []
+    for i in range(1, count + 1):
+        if chain:
+            dependencies = [i - 1] if i > 1 else []
+        else:
+            dependencies = rng.sample(range(1, i), min(i - 1, rng.randint(0, 2)))
+        tasks.append({
+            'id': i,
+            'title': f'Task {i}',
+            'due_date': today + timedelta(days=rng.randint(-10, 60)),
+            'estimated_hours': rng.randint(1, 16),
+            'importance': rng.randint(1, 10),
+            'dependencies': dependencies
+        })
+    return tasks
+
+
+def _time_per_call(func, loops, min_time=0.05):
+    """
+    Seconds per call of func, calling it loops times in a row (doubling
+    loops until the whole timing lasts min_time, like timeit's autorange).
+    Returns (seconds per call, loops used). Short timings are mostly
+    scheduler noise on a shared machine; long ones average it out.
+    """
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            return elapsed / loops, loops
+        loops *= 2
+
+
+def _growth_exponent(sizes, seconds):
+    """Least-squares slope of log(time) against log(size): ~1 linear, ~2 quadratic."""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(elapsed, 1e-9)) for elapsed in seconds]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    return (sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+            / sum((x - mean_x) ** 2 for x in xs))
+
+
+class ComplexityRegressionTestCase(SimpleTestCase):
+    """
+    Guards against quadratic slowdowns creeping back into the hot paths.
+    
+    Each path is timed at growing N and the empirical growth exponent must
+    stay under its declared bound. Near-linear paths (including an
+    n log n sort) fit well under 1.3; an O(n^2) loop fits close to 2.
+    """
+    SIZES = [2000, 4000, 8000, 16000]
+    # Cycle detection is fast per task, so it needs larger graphs (all
+    # well past the CPU caches) for other processes' cache traffic to
+    # slow every size alike
+    GRAPH_SIZES = [10000, 20000, 40000, 80000]
+    ROUNDS = 5
+    NEAR_LINEAR = 1.3
+    
+    DEEP_CHAIN = 100000
+    
+    def assertGrowthBelow(self, prepare, bound, sizes=None):
+        """
+        prepare(size) returns the call to time at that size. Every size is
+        timed once per round, so a burst of load hits all sizes alike, and
+        the exponent is fitted on the median time of each size.
+        """
+        sizes = sizes or self.SIZES
+        calls = [prepare(size) for size in sizes]
+        loops = [1] * len(calls)
+        samples = [[] for _ in calls]
+        
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for _ in range(self.ROUNDS):
+                for i, call in enumerate(calls):
+                    seconds, loops[i] = _time_per_call(call, loops[i])
+                    samples[i].append(seconds)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        
+        seconds = [statistics.median(times) for times in samples]
+        exponent = _growth_exponent(sizes, seconds)
+        self.assertLess(exponent, bound,
+                        f"Growth exponent {exponent:.2f} over N={sizes} "
+                        f"(median seconds per call {[round(t, 5) for t in seconds]})")
+    
+    def test_batch_scoring_is_near_linear(self):
+        """Scoring and sorting a task list (/analyze/) should be near-linear."""
+        def prepare(size):
+            tasks = _make_tasks(size)
+            return lambda: analyze_task_list(tasks, 'smart_balance')
+        
+        self.assertGrowthBelow(prepare, self.NEAR_LINEAR)
+    
+    def test_cycle_detection_is_near_linear(self):
+        """Cycle detection should be near-linear in tasks + dependencies."""
+        scorer = TaskScorer()
+        
+        def prepare(size):
+            tasks = _make_tasks(size)
+            return lambda: scorer.detect_circular_dependencies(tasks)
+        
+        self.assertGrowthBelow(prepare, self.NEAR_LINEAR, self.GRAPH_SIZES)
+    
+    def test_session_delta_is_near_linear(self):
+        """
+        A one-task delta should only rescore that task and the ones whose
+        blocked count changed, whatever the list size; applying it and
+        re-sorting the ranking (what a delta request does) stays near-linear.
+        """
+        def prepare(size):
+            session = AnalysisSession()
+            session.apply(add=_make_tasks(size))
+            delta = [{'id': size // 2, 'importance': 9, 'dependencies': [1]}]
+            session.apply(update=delta)
+            # The task, up to two old dependencies and the new one
+            self.assertLessEqual(session.last_rescored, 4)
+            
+            def update():
+                session.apply(update=delta)
+                session.ranking()
+            return update
+        
+        self.assertGrowthBelow(prepare, self.NEAR_LINEAR)
+    
+    def test_deep_chain_cycle_detection(self):
+        """A 100k-long dependency chain must not hit the recursion limit."""
+        tasks = _make_tasks(self.DEEP_CHAIN, chain=True)
+        
+        tracemalloc.start()
+        try:
+            cycles = TaskScorer().detect_circular_dependencies(tasks)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        self.assertEqual(cycles, [])
+        self.assertLess(peak, 32 * 2 ** 20, f"Peak memory {peak / 2 ** 20:.1f} MB")
+        
+        # Closing the chain into a loop should still be found
+        tasks[0]['dependencies'] = [self.DEEP_CHAIN]
+        cycles = TaskScorer().detect_circular_dependencies(tasks)
+        self.assertEqual(len(cycles), 1)
+        self.assertEqual(len(cycles[0]), self.DEEP_CHAIN + 1)
+    
+    def test_deep_chain_analysis(self):
+        """Analyzing a 100k-long chain should finish within a memory ceiling."""
+        tasks = _make_tasks(self.DEEP_CHAIN, chain=True)
+        
+        tracemalloc.start()
+        try:
+            result = analyze_task_list(tasks, 'smart_balance', explain='none')
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        self.assertEqual(result['total_tasks'], self.DEEP_CHAIN)
+        # Mostly the scored copies of the tasks being returned
+        self.assertLess(peak, 96 * 2 ** 20, f"Peak memory {peak / 2 ** 20:.1f} MB")
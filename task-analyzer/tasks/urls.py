@@ -3,5 +3,10 @@ from . import views
 
 urlpatterns = [
     path('analyze/', views.analyze_tasks, name='analyze_tasks'),
+    path('analyze/batch/', views.analyze_batch_tasks, name='analyze_batch_tasks'),
     path('suggest/', views.suggest_tasks, name='suggest_tasks'),
+    path('forecast/', views.forecast_tasks, name='forecast_tasks'),
+    path('<int:task_id>/blocks/', views.task_blocks, name='task_blocks'),
+    path('sessions/', views.create_session, name='create_session'),
+    path('sessions/<str:token>/', views.update_session, name='update_session'),
 ]
\ No newline at end of file
@@ -1,9 +1,38 @@
+from datetime import date, timedelta
+from django.conf import settings
 from django.shortcuts import render
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 from .scoring import TaskScorer
-from .serializers import TaskAnalysisSerializer, TaskWithScoreSerializer
+from .serializers import (
+    TaskAnalysisSerializer, TaskWithScoreSerializer, ForecastSerializer,
+    BatchAnalysisSerializer,
+    SessionCreateSerializer, SessionDeltaSerializer
+)
+from .batch import analyze_task_list, analyze_batch
+from .delta import (
+    AnalysisSession, SessionError, SessionConflict,
+    load_session, save_session, session_lock
+)
+from .models import Task
+from .storage import tasks_blocked_by
+
+def _build_task_list(tasks_data):
+    """Convert validated task data to the dicts TaskScorer works on."""
+    tasks_list = []
+    for i, task_data in enumerate(tasks_data):
+        task_dict = {
+            'id': task_data.get('id', i + 1),
+            'title': task_data['title'],
+            'due_date': task_data['due_date'],
+            'estimated_hours': task_data['estimated_hours'],
+            'importance': task_data['importance'],
+            'dependencies': task_data.get('dependencies', [])
+        }
+        tasks_list.append(task_dict)
+    return tasks_list
+
 
 @api_view(['POST'])
 def analyze_tasks(request):
@@ -13,7 +42,8 @@ def analyze_tasks(request):
     Expected input:
     {
         "tasks": [...],
-        "strategy": "smart_balance"  // optional
+        "strategy": "smart_balance",  // optional
+        "explain": "all"              // optional: "all", "none" or top K
     }
     """
     try:
@@ -26,48 +56,111 @@ def analyze_tasks(request):
         strategy = serializer.validated_data.get('strategy', 'smart_balance')
         
         # Convert to list of dicts for scoring
-        tasks_list = []
-        for i, task_data in enumerate(tasks_data):
-            task_dict = {
-                'id': task_data.get('id', i + 1),
-                'title': task_data['title'],
-                'due_date': task_data['due_date'],
-                'estimated_hours': task_data['estimated_hours'],
-                'importance': task_data['importance'],
-                'dependencies': task_data.get('dependencies', [])
-            }
-            tasks_list.append(task_dict)
-        
-        # Initialize scorer with strategy
-        scorer = TaskScorer(strategy=strategy)
+        tasks_list = _build_task_list(tasks_data)
         
-        # Check for circular dependencies
-        cycles = scorer.detect_circular_dependencies(tasks_list)
-        if cycles:
-            return Response({
-                'error': 'Circular dependencies detected',
-                'cycles': cycles
-            }, status=status.HTTP_400_BAD_REQUEST)
+        result = analyze_task_list(
+            tasks_list, strategy,
+            explain=serializer.validated_data['explain']
+        )
+        if 'error' in result:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
         
-        # Calculate scores
-        scored_tasks = []
-        for task in tasks_list:
-            score = scorer.calculate_priority_score(task, tasks_list)
-            explanation = scorer.generate_explanation(task, score)
+        return Response(result, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+def analyze_batch_tasks(request):
+    """
+    Analyze many independent task lists in one request.
+    
+    Expected input:
+    {
+        "lists": [
+            {"name": "team-a", "tasks": [...], "strategy": "fastest_wins"},
+            {"name": "team-b", "tasks": [...]}
+        ],
+        "strategy": "smart_balance",   // optional default for every list
+        "explain": "none",             // optional default for every list
+        "workers": 4                   // optional, score across processes
+    }
+    
+    Each list is validated and scored on its own: "results" holds the
+    /analyze/ response per list name and "errors" the validation errors or
+    circular dependencies of the lists that failed.
+    """
+    try:
+        serializer = BatchAnalysisSerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        default_strategy = serializer.validated_data['strategy']
+        default_explain = serializer.validated_data['explain']
+        max_workers = getattr(settings, 'TASK_BATCH_MAX_WORKERS', 4)
+        workers = min(serializer.validated_data['workers'], max_workers)
+        
+        jobs = []
+        errors = {}
+        for item in serializer.validated_data['lists']:
+            name = item['name']
+            list_data = {'strategy': default_strategy, 'explain': default_explain}
+            list_data.update(
+                (field, item[field]) for field in ('tasks', 'strategy', 'explain')
+                if field in item
+            )
+            list_serializer = TaskAnalysisSerializer(data=list_data)
+            if not list_serializer.is_valid():
+                errors[name] = list_serializer.errors
+                continue
             
-            scored_tasks.append({
-                **task,
-                'priority_score': score,
-                'explanation': explanation
-            })
+            jobs.append((
+                name,
+                _build_task_list(list_serializer.validated_data['tasks']),
+                list_serializer.validated_data['strategy'],
+                list_serializer.validated_data['explain']
+            ))
         
-        # Sort by score (highest first)
-        scored_tasks.sort(key=lambda x: x['priority_score'], reverse=True)
+        results = {}
+        for (name, *_), result in zip(jobs, analyze_batch(jobs, workers)):
+            if 'error' in result:
+                errors[name] = result
+            else:
+                results[name] = result
         
         return Response({
-            'tasks': scored_tasks,
-            'strategy_used': strategy,
-            'total_tasks': len(scored_tasks)
+            'results': results,
+            'errors': errors,
+            'total_lists': len(serializer.validated_data['lists'])
+        }, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+def task_blocks(request, task_id):
+    """
+    List the stored tasks a task blocks: "blocks" are the tasks that
+    depend on it directly, "blocks_transitively" also includes everything
+    waiting on those in turn. Both come from the dependency index.
+    """
+    try:
+        if not Task.objects.filter(pk=task_id).exists():
+            return Response({
+                'error': 'Task not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response({
+            'id': task_id,
+            'blocks': tasks_blocked_by(task_id),
+            'blocks_transitively': tasks_blocked_by(task_id, transitive=True)
         }, status=status.HTTP_200_OK)
         
     except Exception as e:
@@ -99,4 +192,201 @@ def suggest_tasks(request):
             'error': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+
+@api_view(['POST'])
+def forecast_tasks(request):
+    """
+    Show how the ranking shifts over the next N days.
+    
+    Expected input:
+    {
+        "tasks": [...],
+        "strategy": "smart_balance",   // optional
+        "start_date": "2025-12-01",    // optional, defaults to today
+        "days": 7                      // optional, 1-90
+    }
+    
+    Each day lists the tasks from highest to lowest score with their rank
+    and rank_change (positions moved up since the previous day).
+    """
+    try:
+        serializer = ForecastSerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        tasks_list = _build_task_list(serializer.validated_data['tasks'])
+        strategy = serializer.validated_data.get('strategy', 'smart_balance')
+        start_date = serializer.validated_data.get('start_date') or date.today()
+        days = serializer.validated_data['days']
+        
+        scorer = TaskScorer(strategy=strategy)
+        
+        cycles = scorer.detect_circular_dependencies(tasks_list)
+        if cycles:
+            return Response({
+                'error': 'Circular dependencies detected',
+                'cycles': cycles
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        as_of_dates = [start_date + timedelta(days=offset) for offset in range(days)]
+        matrix = scorer.forecast_scores(tasks_list, as_of_dates)
+        
+        forecast = []
+        previous_ranks = None
+        for as_of, scores in zip(as_of_dates, matrix):
+            # Sort by score (highest first), ties keep input order like analyze
+            order = sorted(range(len(tasks_list)), key=lambda i: scores[i], reverse=True)
+            ranks = {task_index: rank for rank, task_index in enumerate(order, start=1)}
+            
+            forecast.append({
+                'date': as_of,
+                'ranking': [
+                    {
+                        'id': tasks_list[i]['id'],
+                        'priority_score': scores[i],
+                        'rank': ranks[i],
+                        'rank_change': previous_ranks[i] - ranks[i] if previous_ranks else None
+                    }
+                    for i in order
+                ]
+            })
+            previous_ranks = ranks
+        
+        return Response({
+            'tasks': tasks_list,
+            'forecast': forecast,
+            'strategy_used': strategy,
+            'total_tasks': len(tasks_list)
+        }, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _session_response(session, response_status=status.HTTP_200_OK):
+    ranking = session.ranking()
+    return Response({
+        'session': session.token,
+        'tasks': ranking,
+        'strategy_used': session.strategy,
+        'total_tasks': len(ranking),
+        'rescored': session.last_rescored
+    }, status=response_status)
+
+
+def _apply_delta(session, **delta):
+    """Apply a delta, returning an error Response or None on success."""
+    try:
+        cycles = session.apply(**delta)
+    except SessionError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    if cycles:
+        return Response({
+            'error': 'Circular dependencies detected',
+            'cycles': cycles
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return None
+
+
+@api_view(['POST'])
+def create_session(request):
+    """
+    Start a delta analysis session from a full task list.
+    
+    Expected input is the same as /api/tasks/analyze/. Task ids may be
+    supplied so later deltas can refer to them; tasks without one get the
+    next id not used in the list.
+    The response includes a "session" token for /api/tasks/sessions/<token>/.
+    """
+    try:
+        serializer = SessionCreateSerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        tasks_list = [
+            {**task_data, 'dependencies': task_data.get('dependencies', [])}
+            for task_data in serializer.validated_data['tasks']
+        ]
+        
+        session = AnalysisSession(strategy=serializer.validated_data['strategy'])
+        error = _apply_delta(session, add=tasks_list)
+        if error:
+            return error
+        
+        save_session(session)
+        return _session_response(session, status.HTTP_201_CREATED)
+        
+    except Exception as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+def update_session(request, token):
+    """
+    Apply add / update / remove operations to a session and return the
+    updated ranking. Only tasks whose inputs changed are rescored.
+    
+    Expected input:
+    {
+        "add": [...],            // new tasks
+        "update": [...],         // partial tasks, "id" required
+        "remove": [3, 4],        // task ids
+        "strategy": "..."        // optional, rescores everything
+    }
+    
+    If the delta is rejected (unknown ids, circular dependencies) the
+    session is left as it was. Concurrent deltas for one session are
+    applied one at a time; 409 if the session stays busy.
+    """
+    try:
+        serializer = SessionDeltaSerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        delta = serializer.validated_data
+        added = [
+            {**task_data, 'dependencies': task_data.get('dependencies', [])}
+            for task_data in delta['add']
+        ]
+        
+        with session_lock(token):
+            session = load_session(token)
+            if session is None:
+                return Response({
+                    'error': 'Unknown or expired session'
+                }, status=status.HTTP_404_NOT_FOUND)
+            
+            error = _apply_delta(
+                session,
+                add=added,
+                update=delta['update'],
+                remove=delta['remove'],
+                strategy=delta.get('strategy')
+            )
+            if error:
+                return error
+            
+            save_session(session)
+        return _session_response(session)
+        
+    except SessionConflict as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_409_CONFLICT)
+    except Exception as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 # Create your views here.